@@ -10,9 +10,9 @@ from airflow.sdk import DAG
 from airflow.providers.standard.operators.python import PythonOperator
 from airflow.sdk.definitions.deadline import DeadlineAlert, DagRunLogicalDateDeadline, SyncCallback
 
-from pipeline.config import DAG_ID
+from pipeline.config import DAG_ID, SCRAPE_MAX_BATCHES, SCRAPE_POOL
 from pipeline.extract import extract_data_from_newsapi
-from pipeline.scrape import scrape_and_enrich_content
+from pipeline.scrape import build_scrape_batches, scrape_and_enrich_content
 from pipeline.analyze import analyze_articles
 from pipeline.load import load_data_to_postgres
 from pipeline.sla_callbacks import on_sla_miss
@@ -51,10 +51,12 @@ with DAG(
 
     ## Tasks:
     1. `extract_newsapi_task`: Extracts top headlines from NewsAPI.
-    2. `scrape_content_task`: Scrapes the full content for each article.
-     3. `ml_analysis_task`: Analyzes articles with sentiment analysis and NER.
-     4. `load_postgres_task`: Loads the enriched articles into PostgreSQL
-        (SLA: 9 hours — data must be ready before 9 AM).
+    2. `build_scrape_batches_task`: Groups the articles into per-domain batches.
+    3. `scrape_content_task`: Scrapes the full content for each article
+       (one mapped instance per batch, limited by the `scrape_pool` pool).
+    4. `ml_analysis_task`: Analyzes articles with sentiment analysis and NER.
+    5. `load_postgres_task`: Loads the enriched articles into PostgreSQL
+       (SLA: 9 hours — data must be ready before 9 AM).
     """,
 ) as dag:
     # Task 1: Extract data from NewsAPI
@@ -63,19 +65,29 @@ with DAG(
         python_callable=extract_data_from_newsapi,
     )
 
-    # Task 2: Scrape and enrich the articles with full content (parallel)
-    scrape_task = PythonOperator(
+    # Task 2: Split the articles into per-domain batches for mapped scraping
+    batch_task = PythonOperator(
+        task_id="build_scrape_batches_task",
+        python_callable=build_scrape_batches,
+    )
+
+    # Task 3: Scrape and enrich the articles with full content — one mapped
+    #   instance per batch, spread across worker slots of the scrape pool
+    scrape_task = PythonOperator.partial(
         task_id="scrape_content_task",
         python_callable=scrape_and_enrich_content,
-    )
+        pool=SCRAPE_POOL,
+        max_active_tis_per_dag=SCRAPE_MAX_BATCHES,
+    ).expand(op_kwargs=batch_task.output)
 
-    # Task 3: ML analysis
+    # Task 4: ML analysis — kept apart from the load so a database failure retries
+    #   only the (single-statement) insert, not the NER pass
     ml_analysis_task = PythonOperator(
         task_id="ml_analysis_task",
         python_callable=analyze_articles,
     )
 
-    # Task 4: Load enriched data into PostgreSQL (Deadline: 9h after logical_date — data must be
+    # Task 5: Load enriched data into PostgreSQL (Deadline: 9h after logical_date — data must be
     #   ready before 9 AM consumption window when DAG runs at midnight).
     load_task = PythonOperator(
         task_id="load_postgres_task",
@@ -83,4 +95,4 @@ with DAG(
     )
 
     # Task dependency chain
-    extract_task >> scrape_task >> ml_analysis_task >> load_task
+    extract_task >> batch_task >> scrape_task >> ml_analysis_task >> load_task
@@ -2,40 +2,102 @@
 NLP analysis module — sentiment analysis with TextBlob and NER with spaCy.
 """
 
+import functools
 import logging
+import math
 
 import spacy
-from textblob import TextBlob
+from spacy.language import Language
+from spacy.tokens import Doc
+from textblob.sentiments import PatternAnalyzer
+
+from pipeline.credentials import resolve_ner_processes
 
 logger = logging.getLogger(__name__)
 
+SPACY_MODEL = "en_core_web_sm"
+# Only NER output is consumed — skip loading the rest of the pipeline. The shared
+# tok2vec only feeds the tagger and parser; ner has its own internal tok2vec.
+SPACY_EXCLUDED_COMPONENTS = ["tok2vec", "tagger", "parser", "lemmatizer", "attribute_ruler"]
+NER_BATCH_SIZE = 16
+NER_MAX_CHARS = 100000
+# Sentiment saturates within the first few KB; short snippets score as noise
+SENTIMENT_MAX_CHARS = 20000
+SENTIMENT_MIN_CHARS = 200
+# Entity types kept from spaCy's NER output
+NER_LABELS = frozenset({"PERSON", "ORG", "GPE", "PRODUCT"})
+
+Doc.set_extension("sentiment_polarity", default=None, force=True)
+Doc.set_extension("sentiment_subjectivity", default=None, force=True)
+
+_sentiment_analyzer = PatternAnalyzer()
+
+
+@Language.component("pattern_sentiment")
+def _pattern_sentiment(doc: Doc) -> Doc:
+    """Score a doc with TextBlob's pattern analyzer inside the spaCy pipeline.
+
+    Running as a pipeline component lets sentiment share the ``nlp.pipe``
+    worker processes with NER instead of running serially afterwards. Only the
+    first ``SENTIMENT_MAX_CHARS`` are scored; texts shorter than
+    ``SENTIMENT_MIN_CHARS`` are left unscored (``None``).
+    """
+    body = doc.text[:SENTIMENT_MAX_CHARS]
+    if len(body) < SENTIMENT_MIN_CHARS:
+        return doc
+    sentiment = _sentiment_analyzer.analyze(body)
+    doc._.sentiment_polarity = sentiment.polarity
+    doc._.sentiment_subjectivity = sentiment.subjectivity
+    return doc
+
+
+@functools.lru_cache(maxsize=1)
+def _load_nlp() -> Language:
+    """Load the NER + sentiment spaCy pipeline once per process.
+
+    Loaded lazily on first use, never at import — the DAG file imports this
+    module at parse time.
+    """
+    nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDED_COMPONENTS)
+    nlp.add_pipe("pattern_sentiment", last=True)
+    return nlp
+
 
 def analyze_articles(**context) -> list[dict]:
     """Analyzes articles for sentiment and named entities using ML models.
 
+    Documents are streamed through spaCy's ``nlp.pipe`` in batches of
+    ``NER_BATCH_SIZE`` with every component except NER excluded, spread over
+    up to ``NER_PROCESSES`` worker processes. Sentiment is scored in the same
+    pass by the ``pattern_sentiment`` component (TextBlob's default analyzer).
+
     Args:
         context (dict): Airflow context for accessing XCom data.
 
     Returns:
         list: List of articles enriched with sentiment and named entity data.
     """
-    articles = context["ti"].xcom_pull(task_ids="scrape_content_task")
+    # scrape_content_task is mapped — pull every instance's batch and flatten
+    batches = context["ti"].xcom_pull(task_ids=["scrape_content_task"])
+    articles = [article for batch in batches or [] if batch for article in batch]
     if not articles:
         logger.warning("No articles to analyze.")
         return []
 
     try:
-        nlp = spacy.load("en_core_web_sm")
+        nlp = _load_nlp()
     except OSError:
         logger.error(
-            "spaCy model 'en_core_web_sm' not found. Ensure it was downloaded in the Docker image."
+            "spaCy model '%s' not found. Ensure it was downloaded in the Docker image.",
+            SPACY_MODEL,
         )
         raise
 
-    analyzed_articles = []
+    with_content = []
     for article in articles:
-        content = article.get("content")
-        if not content:
+        if article.get("content"):
+            with_content.append(article)
+        else:
             article.update(
                 {
                     "sentiment_polarity": None,
@@ -43,25 +105,28 @@ def analyze_articles(**context) -> list[dict]:
                     "named_entities": None,
                 }
             )
-            analyzed_articles.append(article)
-            continue
 
-        # 1. Sentiment Analysis with TextBlob
-        blob = TextBlob(content)
-        article["sentiment_polarity"] = blob.sentiment.polarity
-        article["sentiment_subjectivity"] = blob.sentiment.subjectivity
+    # Never start more worker processes than there are batches to hand them
+    n_process = min(resolve_ner_processes(), max(1, math.ceil(len(with_content) / NER_BATCH_SIZE)))
+    logger.info("Running NER on %d articles with %d processes", len(with_content), n_process)
+
+    # Limit content length to prevent memory issues
+    texts = (article["content"][:NER_MAX_CHARS] for article in with_content)
+    docs = nlp.pipe(texts, batch_size=NER_BATCH_SIZE, n_process=n_process)
+
+    for article, doc in zip(with_content, docs, strict=True):
+        # 1. Sentiment Analysis with TextBlob's pattern analyzer (pipeline component)
+        article["sentiment_polarity"] = doc._.sentiment_polarity
+        article["sentiment_subjectivity"] = doc._.sentiment_subjectivity
 
         # 2. Named Entity Recognition (NER) with spaCy
-        # Limit content length to prevent memory issues
-        doc = nlp(content[:100000])
-        entities = [
-            {"text": ent.text, "label": ent.label_}
-            for ent in doc.ents
-            if ent.label_ in ["PERSON", "ORG", "GPE", "PRODUCT"]
-        ]
+        entities = []
+        for ent in doc.ents:
+            label = ent.label_
+            if label in NER_LABELS:
+                entities.append({"text": ent.text, "label": label})
         article["named_entities"] = entities
 
         logger.info("Analyzed article: %s...", article.get("title", "No Title")[:50])
-        analyzed_articles.append(article)
 
-    return analyzed_articles
+    return articles
@@ -13,4 +13,36 @@ DEFAULT_CONN_ID = "postgres_default"
 NEWS_API_COUNTRY = "us"
 NEWS_API_TOPIC = None  # None = no category filter (NewsAPI `category` param)
 
+# Last NewsAPI response (articles + ETag/Last-Modified) for conditional requests;
+# lives on the data volume so it survives worker restarts
+NEWS_API_CACHE_PATH = "/opt/airflow/data/newsapi_cache.json"
+
+# Scraping politeness: minimum spacing between requests to the same domain
+SCRAPE_DOMAIN_DELAY_SECONDS = 0.2
+
+# Scraping HTTP session: number of per-host connection pools kept alive
+SCRAPE_POOL_CONNECTIONS = 64
+
+# Scraping retries (urllib3 Retry on the session adapter): attempts after the
+# first request, exponential backoff factor, and the cap on Retry-After waits
+SCRAPE_RETRY_TOTAL = 3
+SCRAPE_RETRY_BACKOFF_FACTOR = 0.5
+SCRAPE_RETRY_AFTER_MAX_SECONDS = 30
+
+# robots.txt is fetched once per domain before scraping starts, without retries,
+# so a failing host cannot hold up the batch
+SCRAPE_ROBOTS_TIMEOUT_SECONDS = 5
+
+# Only the first bytes of each page are read — the article body sits near the top
+SCRAPE_MAX_BYTES = 256 * 1024
+
+# Mapped scraping: articles are split into at most this many batches, each run as
+# one mapped task instance in the Airflow pool below (created in docker-compose)
+SCRAPE_MAX_BATCHES = 16
+SCRAPE_POOL = "scrape_pool"
+
+# Articles already stored with at least this much content are not re-scraped
+# (NewsAPI snippets are ~200 chars, so shorter content means an earlier scrape failed)
+SCRAPE_SKIP_MIN_CONTENT_CHARS = 500
+
 logger = logging.getLogger(__name__)
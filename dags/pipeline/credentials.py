@@ -253,6 +253,42 @@ def resolve_max_scrape_workers() -> int:
     return 4
 
 
+def resolve_ner_processes() -> int:
+    """Resolve the number of spaCy worker processes used for NER.
+
+    Resolution order:
+        1. Airflow Variable (NER_PROCESSES)
+        2. Environment variable (NER_PROCESSES)
+        3. .env file
+        4. Default: CPU count minus one, leaving a core for the task runner
+
+    The returned value is always at least 1.
+
+    Returns:
+        int: Number of NER processes.
+    """
+    default = max(1, (os.cpu_count() or 1) - 1)
+    raw: Optional[str] = None
+
+    # 1. Airflow Variable
+    var_val = _try_airflow_variable("NER_PROCESSES")
+    if var_val is not None:
+        raw = var_val
+
+    if raw is None:
+        # 2. Environment variables + .env fallback
+        _load_dotenv()
+        raw = os.environ.get("NER_PROCESSES")
+
+    if raw is not None:
+        try:
+            return max(1, int(raw))
+        except (ValueError, TypeError):
+            logger.warning("Invalid NER_PROCESSES value '%s', using default %d", raw, default)
+
+    return default
+
+
 def get_db_connection():
     """Get a database connection using stratified credential resolution.
 
@@ -3,12 +3,14 @@ NewsAPI extraction module — fetches top headlines from NewsAPI with tenacity r
 """
 
 import logging
+import os
 
+import orjson
 import requests
 from airflow.exceptions import AirflowException
 from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
-from pipeline.config import NEWS_API_ENDPOINT
+from pipeline.config import NEWS_API_CACHE_PATH, NEWS_API_ENDPOINT
 from pipeline.credentials import resolve_newsapi_country, resolve_newsapi_key, resolve_newsapi_topic
 
 logger = logging.getLogger(__name__)
@@ -46,6 +48,52 @@ def _validate_article(article: dict) -> bool:
     return True
 
 
+def _cache_key(params: dict) -> dict:
+    """Query parameters identifying a cached response (the API key excluded)."""
+    return {key: value for key, value in params.items() if key != "apiKey"}
+
+
+def _load_cached_response(params: dict) -> dict | None:
+    """Load the cached NewsAPI response if it was fetched with the same query.
+
+    Returns None when there is no cache file, it cannot be read, or it
+    belongs to a different country/category query.
+    """
+    try:
+        with open(NEWS_API_CACHE_PATH, "rb") as f:
+            cached = orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    if not isinstance(cached, dict) or cached.get("params") != _cache_key(params):
+        return None
+    return cached
+
+
+def _store_cached_response(params: dict, response: requests.Response, articles: list) -> None:
+    """Persist the articles with the response's validators for the next run.
+
+    Only responses carrying an ``ETag`` or ``Last-Modified`` header are
+    cached. Failures are logged and ignored — the cache is an optimization.
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        return
+    cached = {
+        "params": _cache_key(params),
+        "etag": etag,
+        "last_modified": last_modified,
+        "articles": articles,
+    }
+    tmp_path = f"{NEWS_API_CACHE_PATH}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(cached))
+        os.replace(tmp_path, NEWS_API_CACHE_PATH)
+    except OSError as exc:
+        logger.warning("Could not write NewsAPI cache %s: %s", NEWS_API_CACHE_PATH, exc)
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=1, max=4),
@@ -55,6 +103,10 @@ def _validate_article(article: dict) -> bool:
 def _fetch_newsapi(endpoint: str, params: dict) -> list[dict]:
     """Fetch articles from NewsAPI with retry on transient errors.
 
+    The request is conditional when a cached response for the same query
+    exists: ``If-None-Match``/``If-Modified-Since`` are sent and a 304 reuses
+    the cached articles without downloading or parsing a new body.
+
     Args:
         endpoint: NewsAPI endpoint URL.
         params: Query parameters including apiKey.
@@ -64,11 +116,26 @@ def _fetch_newsapi(endpoint: str, params: dict) -> list[dict]:
 
     Raises:
         requests.exceptions.RequestException: On HTTP errors after retries.
-        RuntimeError: On API error body (e.g., rateLimited) after retries.
+        RuntimeError: On API error body (e.g., rateLimited) or malformed JSON
+            after retries.
     """
-    response = requests.get(endpoint, params=params, timeout=30)
+    cached = _load_cached_response(params)
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = requests.get(endpoint, params=params, headers=headers, timeout=30)
     response.raise_for_status()  # → HTTPError for non-2xx (caught by _is_retryable)
-    data = response.json()
+    if response.status_code == 304 and cached:
+        logger.info("NewsAPI headlines unchanged since last run; reusing cached articles")
+        return cached["articles"]
+    try:
+        data = orjson.loads(response.content)
+    except orjson.JSONDecodeError as exc:
+        raise RuntimeError(f"Invalid JSON in API response: {exc}") from exc
     if data.get("status") != "ok":
         # NewsAPI can return 200 with error body on rate limits
         raise RuntimeError(f"API Error: {data.get('message', 'Unknown error')}")
@@ -77,6 +144,7 @@ def _fetch_newsapi(endpoint: str, params: dict) -> list[dict]:
     if not isinstance(articles, list):
         logger.warning("NewsAPI response missing 'articles' list; got %s", type(articles).__name__)
         return []
+    _store_cached_response(params, response, articles)
     return articles
 
 
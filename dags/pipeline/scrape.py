@@ -1,42 +1,164 @@
 """
-Concurrent web scraping with retry, robots.txt compliance, and configurable workers.
+Concurrent web scraping with retry, robots.txt compliance, per-domain rate
+limiting, and configurable workers.
 """
 
+import codecs
 import logging
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 from urllib.robotparser import RobotFileParser
 
 import requests
-from bs4 import BeautifulSoup
-from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+from lxml import etree
+from lxml import html as lxml_html
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from pipeline.credentials import resolve_max_scrape_workers, resolve_user_agent
+from pipeline.config import (
+    SCRAPE_DOMAIN_DELAY_SECONDS,
+    SCRAPE_MAX_BATCHES,
+    SCRAPE_MAX_BYTES,
+    SCRAPE_POOL_CONNECTIONS,
+    SCRAPE_RETRY_AFTER_MAX_SECONDS,
+    SCRAPE_RETRY_BACKOFF_FACTOR,
+    SCRAPE_RETRY_TOTAL,
+    SCRAPE_ROBOTS_TIMEOUT_SECONDS,
+    SCRAPE_SKIP_MIN_CONTENT_CHARS,
+)
+from pipeline.credentials import (
+    get_db_connection,
+    resolve_max_scrape_workers,
+    resolve_user_agent,
+)
 
 logger = logging.getLogger(__name__)
 
+# Compiled once and reused for every scraped page
+_PARAGRAPHS = etree.XPath("//p")
 
-def _is_retryable(exception: BaseException) -> bool:
-    """Determine if a request exception should be retried.
+SQL_INGESTED_URLS = """
+    SELECT url FROM news_articles
+    WHERE url = ANY(%s) AND length(coalesce(content, '')) >= %s;
+    """
+
+
+def _build_session(user_agent: str, max_workers: int = 1, retries: bool = True) -> requests.Session:
+    """Create a keep-alive session shared by all scrape workers.
+
+    Connections are pooled per host (up to ``max_workers`` each), so later
+    requests to a domain reuse an open TCP/TLS connection; pages cut off at
+    ``SCRAPE_MAX_BYTES`` close theirs instead. This stays on requests over
+    HTTP/1.1 rather than HTTP/2: multiplexing would need httpx plus the h2
+    dependency, and httpx has no counterpart to the adapter's status and
+    Retry-After retries below or to urllib3's byte-capped streaming reads.
+
+    Transient failures — connection errors, timeouts, 429 and 5xx — are
+    retried inside the adapter with exponential backoff, honouring the
+    server's Retry-After header. 404 and other 4xx are never retried.
+    Once retries run out the last response is returned as-is, so callers
+    still see its status through ``raise_for_status``. With ``retries=False``
+    every response is returned after a single attempt.
+    """
+    retry = Retry(
+        total=SCRAPE_RETRY_TOTAL,
+        backoff_factor=SCRAPE_RETRY_BACKOFF_FACTOR,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        retry_after_max=SCRAPE_RETRY_AFTER_MAX_SECONDS,
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    session.headers.update({"User-Agent": user_agent})
+    adapter = HTTPAdapter(
+        pool_connections=SCRAPE_POOL_CONNECTIONS,
+        pool_maxsize=max_workers,
+        max_retries=retry if retries else 0,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _fetch_robots(session: requests.Session, domain: str) -> RobotFileParser:
+    """Fetch and parse a domain's robots.txt through the given session.
+
+    Mirrors ``RobotFileParser.read``: 401/403 disallow everything, any other
+    4xx allows everything, 5xx leaves the parser unread (so ``can_fetch``
+    refuses every URL), and connection errors raise.
+    """
+    rp = RobotFileParser()
+    rp.set_url(f"https://{domain}/robots.txt")
+    response = session.get(rp.url, timeout=SCRAPE_ROBOTS_TIMEOUT_SECONDS)
+    if response.status_code in (401, 403):
+        rp.disallow_all = True
+    elif 400 <= response.status_code < 500:
+        rp.allow_all = True
+    elif response.status_code < 500:
+        rp.parse(response.text.splitlines())
+    return rp
+
+
+def _html_parser(content_type: str, raw: bytes) -> lxml_html.HTMLParser | None:
+    """Pick the encoding to parse a scraped page with.
+
+    lxml only sees the bytes, so without a ``<meta charset>`` it reads UTF-8
+    as Latin-1. The ``charset`` from the Content-Type header wins; otherwise
+    UTF-8 is used when the body decodes as UTF-8 (a character split by the
+    ``SCRAPE_MAX_BYTES`` cut is ignored). Returns None to let lxml detect it.
+    """
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "charset":
+            charset = value.strip().strip("'\"")
+            try:
+                codecs.lookup(charset)
+            except LookupError:
+                break
+            return lxml_html.HTMLParser(encoding=charset)
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(raw, final=False)
+    except UnicodeDecodeError:
+        return None
+    return lxml_html.HTMLParser(encoding="utf-8")
+
+
+class _DomainRateLimiter:
+    """Enforce a minimum interval between requests to the same domain.
 
-    Retry on connection errors, 429 (rate limit), and 5xx (server errors).
-    Skip 404 permanently — retrying won't fix a missing page.
+    Holds one lock per domain, so workers hitting different hosts never block
+    each other while requests to a single host are spaced out.
     """
-    if isinstance(exception, requests.exceptions.HTTPError):
-        if exception.response is not None:
-            status = exception.response.status_code
-            if status == 404:  # Not Found — permanent
-                return False
-            if status == 429:  # Too Many Requests — transient
-                return True
-            if 500 <= status < 600:  # Server errors — transient
-                return True
-        return False
-    # ConnectionError, Timeout, etc. — retry
-    return True
-
-
-def _scrape_single_article(article: dict, user_agent: str, robots_cache: dict) -> dict:
+
+    def __init__(self, min_interval: float) -> None:
+        self._min_interval = min_interval
+        self._guard = threading.Lock()
+        self._locks: dict[str, threading.Lock] = {}
+        self._last_hit: dict[str, float] = {}
+
+    def wait(self, domain: str) -> None:
+        """Block until a request to ``domain`` is allowed, then record the hit."""
+        with self._guard:
+            lock = self._locks.setdefault(domain, threading.Lock())
+        with lock:
+            last = self._last_hit.get(domain)
+            if last is not None:
+                remaining = self._min_interval - (time.monotonic() - last)
+                if remaining > 0:
+                    time.sleep(remaining)
+            self._last_hit[domain] = time.monotonic()
+
+
+def _scrape_single_article(
+    article: dict,
+    user_agent: str,
+    robots_cache: dict,
+    session: requests.Session,
+    rate_limiter: _DomainRateLimiter | None = None,
+) -> dict:
     """Scrape full content for a single article. Worker for ThreadPoolExecutor."""
     url = article.get("url")
     if not url:
@@ -55,24 +177,33 @@ def _scrape_single_article(article: dict, user_agent: str, robots_cache: dict) -
         # If robots check fails for any reason, proceed cautiously
         pass
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=4),
-        retry=retry_if_exception(_is_retryable),
-        reraise=True,
-    )
-    def _fetch_with_retry(fetch_url: str, headers: dict) -> requests.Response:
-        resp = requests.get(fetch_url, headers=headers, timeout=15)
-        resp.raise_for_status()
-        return resp
-
     try:
-        headers = {"User-Agent": user_agent}
-        response = _fetch_with_retry(url, headers)
+        if rate_limiter is not None:
+            rate_limiter.wait(urlparse(url).netloc)
+        # Retries with backoff happen inside the session's adapter
+        response = session.get(url, timeout=15, stream=True)
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError:
+            response.close()  # release the pooled connection
+            raise
 
-        soup = BeautifulSoup(response.content, "html.parser")
-        paragraphs = soup.find_all("p")
-        full_content = " ".join([p.get_text() for p in paragraphs])
+        # Stream the body: skip non-HTML before downloading it, and read at most
+        # SCRAPE_MAX_BYTES (gzip/deflate decoded) of pages that are HTML
+        with response:
+            content_type = response.headers.get("Content-Type", "")
+            if content_type and "html" not in content_type.lower():
+                logger.warning("Skipping non-HTML response (%s) from %s", content_type, url)
+                return article
+            raw = response.raw.read(SCRAPE_MAX_BYTES, decode_content=True)
+
+        if not raw:
+            logger.warning("Empty response body from %s. Keeping original.", url)
+            return article
+
+        tree = lxml_html.fromstring(raw, parser=_html_parser(content_type, raw))
+        paragraphs = _PARAGRAPHS(tree)
+        full_content = " ".join(p.text_content() for p in paragraphs)
 
         if full_content and len(full_content) > len(article.get("content") or ""):
             logger.info("Successfully scraped full content from: %s", url)
@@ -96,22 +227,99 @@ def _scrape_single_article(article: dict, user_agent: str, robots_cache: dict) -
     return article
 
 
-def scrape_and_enrich_content(**context) -> list[dict]:
-    """Performs concurrent web scraping on article URLs with robots.txt compliance.
+def _drop_already_ingested(articles: list[dict]) -> list[dict]:
+    """Drop articles whose url is already stored in news_articles with full content.
 
-    Uses ThreadPoolExecutor with configurable workers, tenacity retry with
-    exponential backoff, and a configurable User-Agent. Robots.txt is fetched
-    once per domain and cached in a dict initialized INSIDE this function.
+    Articles stored with missing or snippet-length content are kept so an
+    earlier failed scrape gets another chance. If the lookup itself fails,
+    every article is kept and scraped as before.
+    """
+    urls = [article["url"] for article in articles if article.get("url")]
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(SQL_INGESTED_URLS, (urls, SCRAPE_SKIP_MIN_CONTENT_CHARS))
+            ingested = {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as exc:
+        logger.warning("Could not look up already-ingested articles, scraping all: %s", exc)
+        return articles
+
+    remaining = [article for article in articles if article.get("url") not in ingested]
+    if len(remaining) < len(articles):
+        logger.info(
+            "Skipping %d articles already ingested; %d remain",
+            len(articles) - len(remaining),
+            len(remaining),
+        )
+    return remaining
+
+
+def build_scrape_batches(**context) -> list[dict]:
+    """Partitions extracted articles into batches for the mapped scrape task.
+
+    Articles already stored with full content are dropped first. The rest are
+    grouped by domain and whole domains are packed into at most
+    ``SCRAPE_MAX_BATCHES`` batches (largest domains first), so each mapped
+    instance fetches robots.txt once per domain and rate-limits it locally.
 
     Args:
         context (dict): Airflow context for accessing XCom data.
 
     Returns:
-        list: List of articles with the 'content' field updated with scraped data.
+        list: One ``{"articles": [...]}`` op_kwargs dict per mapped scrape instance.
     """
-    # Retrieve articles from the previous task
     articles = context["ti"].xcom_pull(task_ids="extract_newsapi_task")
 
+    if not articles:
+        logger.warning("No articles to scrape.")
+        return []
+
+    articles = _drop_already_ingested(articles)
+    if not articles:
+        logger.info("All articles were already ingested; nothing to scrape.")
+        return []
+
+    by_domain: dict[str, list[dict]] = {}
+    for article in articles:
+        domain = urlparse(article.get("url") or "").netloc
+        by_domain.setdefault(domain, []).append(article)
+
+    batches: list[list[dict]] = [[] for _ in range(min(SCRAPE_MAX_BATCHES, len(by_domain)))]
+    for group in sorted(by_domain.values(), key=len, reverse=True):
+        min(batches, key=len).extend(group)
+
+    logger.info(
+        "Split %d articles from %d domains into %d scrape batches",
+        len(articles),
+        len(by_domain),
+        len(batches),
+    )
+    return [{"articles": batch} for batch in batches]
+
+
+def scrape_and_enrich_content(articles: list[dict], **context) -> list[dict]:
+    """Performs concurrent web scraping on article URLs with robots.txt compliance.
+
+    Uses ThreadPoolExecutor with configurable workers sharing one keep-alive
+    ``requests.Session`` (which retries transient failures with exponential,
+    Retry-After-aware backoff), and a configurable User-Agent. Robots.txt is fetched
+    once per domain and cached in a dict initialized INSIDE this function.
+    Requests to the same domain are spaced by ``SCRAPE_DOMAIN_DELAY_SECONDS``
+    so concurrent workers never hammer a single host.
+
+    Runs as one mapped instance per batch from ``build_scrape_batches``.
+
+    Args:
+        articles (list): The batch of articles assigned to this mapped instance.
+        context (dict): Airflow context.
+
+    Returns:
+        list: List of articles with the 'content' field updated with scraped data.
+    """
     if not articles:
         logger.warning("No articles to scrape.")
         return []
@@ -126,32 +334,35 @@ def scrape_and_enrich_content(**context) -> list[dict]:
         user_agent.split("/")[0],
     )
 
+    # --- Shared keep-alive session (created INSIDE the task, like the caches below) ---
+    session = _build_session(user_agent, max_workers)
+
     # --- Build robots.txt cache (fetch once per domain before ThreadPool) ---
     # Cache is initialized INSIDE the task function, NEVER at module global scope.
     robots_cache: dict = {}
     domains_seen: set = set()
 
-    for article in articles:
-        url = article.get("url")
-        if not url:
-            continue
-        domain = urlparse(url).netloc
-        if domain not in domains_seen:
-            domains_seen.add(domain)
-            rp = RobotFileParser()
-            rp.set_url(f"https://{domain}/robots.txt")
-            try:
-                rp.read()
-                robots_cache[domain] = rp
-                logger.debug("Fetched robots.txt for %s", domain)
-            except Exception:
-                logger.warning("Could not fetch robots.txt for %s", domain)
-                robots_cache[domain] = None
+    # Fetched without retries: one failing host must not stall the whole batch
+    with _build_session(user_agent, retries=False) as robots_session:
+        for article in articles:
+            url = article.get("url")
+            if not url:
+                continue
+            domain = urlparse(url).netloc
+            if domain not in domains_seen:
+                domains_seen.add(domain)
+                try:
+                    robots_cache[domain] = _fetch_robots(robots_session, domain)
+                    logger.debug("Fetched robots.txt for %s", domain)
+                except Exception:
+                    logger.warning("Could not fetch robots.txt for %s", domain)
+                    robots_cache[domain] = None
 
     # --- Scrape concurrently ---
+    rate_limiter = _DomainRateLimiter(SCRAPE_DOMAIN_DELAY_SECONDS)
     results: list = []
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
         future_map = {}
         for i, article in enumerate(articles):
             future = executor.submit(
@@ -159,6 +370,8 @@ def scrape_and_enrich_content(**context) -> list[dict]:
                 article.copy(),
                 user_agent,
                 robots_cache,
+                session,
+                rate_limiter,
             )
             future_map[future] = i
 
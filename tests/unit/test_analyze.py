@@ -5,7 +5,7 @@ Tests cover: sentiment polarity/subjectivity, named entity extraction,
 empty content edge case, and spaCy model handling.
 """
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -58,7 +58,7 @@ class TestAnalyzeArticles:
         THEN sentiment_polarity, sentiment_subjectivity, and
              named_entities are populated."""
         mock_context = {"ti": MagicMock()}
-        mock_context["ti"].xcom_pull.return_value = [enriched_article]
+        mock_context["ti"].xcom_pull.return_value = [[enriched_article]]
 
         from pipeline.analyze import analyze_articles
 
@@ -84,7 +84,7 @@ class TestAnalyzeArticles:
         WHEN analyze_articles processes it
         THEN sentiment and entities are set to None."""
         mock_context = {"ti": MagicMock()}
-        mock_context["ti"].xcom_pull.return_value = articles_with_varied_content
+        mock_context["ti"].xcom_pull.return_value = [articles_with_varied_content]
 
         from pipeline.analyze import analyze_articles
 
@@ -114,7 +114,7 @@ class TestAnalyzeArticles:
         WHEN analyze_articles runs
         THEN only PERSON, ORG, GPE, PRODUCT entities are returned."""
         mock_context = {"ti": MagicMock()}
-        mock_context["ti"].xcom_pull.return_value = [enriched_article]
+        mock_context["ti"].xcom_pull.return_value = [[enriched_article]]
 
         from pipeline.analyze import analyze_articles
 
@@ -125,3 +125,119 @@ class TestAnalyzeArticles:
         valid_labels = {"PERSON", "ORG", "GPE", "PRODUCT"}
         for entity in article["named_entities"]:
             assert entity["label"] in valid_labels, f"Unexpected label: {entity['label']}"
+
+    def test_ner_runs_batched_with_unused_components_excluded(self, articles_with_varied_content):
+        """GIVEN articles with and without content
+        WHEN analyze_articles runs
+        THEN spaCy loads without the unused components and only articles
+             with content are streamed through nlp.pipe in batches."""
+        mock_doc = MagicMock(ents=[])
+        mock_doc._.sentiment_polarity = 0.5
+        mock_doc._.sentiment_subjectivity = 0.25
+        mock_nlp = MagicMock()
+        mock_nlp.pipe.return_value = iter([mock_doc])
+
+        mock_context = {"ti": MagicMock()}
+        mock_context["ti"].xcom_pull.return_value = [articles_with_varied_content]
+
+        from pipeline.analyze import _load_nlp, analyze_articles
+
+        _load_nlp.cache_clear()
+        with (
+            patch("pipeline.analyze.spacy.load", return_value=mock_nlp) as mock_load,
+            patch("pipeline.analyze.resolve_ner_processes", return_value=4),
+        ):
+            result = analyze_articles(**mock_context)
+        _load_nlp.cache_clear()
+
+        assert "parser" in mock_load.call_args[1]["exclude"]
+        assert "tok2vec" in mock_load.call_args[1]["exclude"]
+        mock_nlp.add_pipe.assert_called_once_with("pattern_sentiment", last=True)
+        texts, kwargs = list(mock_nlp.pipe.call_args[0][0]), mock_nlp.pipe.call_args[1]
+        assert texts == [articles_with_varied_content[0]["content"]]
+        assert kwargs["batch_size"] == 16
+        # One article fits in one batch — no point starting extra processes
+        assert kwargs["n_process"] == 1
+        assert result[0]["named_entities"] == []
+        assert result[0]["sentiment_polarity"] == 0.5
+        assert result[0]["sentiment_subjectivity"] == 0.25
+        assert result[1]["named_entities"] is None
+
+    def test_only_kept_entity_labels_returned(self, enriched_article):
+        """GIVEN a doc whose entities include labels outside NER_LABELS
+        WHEN analyze_articles runs
+        THEN only PERSON, ORG, GPE and PRODUCT entities are kept, in order."""
+        ents = [
+            MagicMock(text="Jerome Powell", label_="PERSON"),
+            MagicMock(text="today", label_="DATE"),
+            MagicMock(text="Federal Reserve", label_="ORG"),
+            MagicMock(text="500", label_="CARDINAL"),
+        ]
+        mock_doc = MagicMock(ents=ents)
+        mock_nlp = MagicMock()
+        mock_nlp.pipe.return_value = iter([mock_doc])
+
+        mock_context = {"ti": MagicMock()}
+        mock_context["ti"].xcom_pull.return_value = [[enriched_article]]
+
+        from pipeline.analyze import analyze_articles
+
+        with (
+            patch("pipeline.analyze._load_nlp", return_value=mock_nlp),
+            patch("pipeline.analyze.resolve_ner_processes", return_value=1),
+        ):
+            result = analyze_articles(**mock_context)
+
+        assert result[0]["named_entities"] == [
+            {"text": "Jerome Powell", "label": "PERSON"},
+            {"text": "Federal Reserve", "label": "ORG"},
+        ]
+
+    def test_pattern_sentiment_component_matches_textblob(self):
+        """GIVEN a text scored by TextBlob
+        WHEN the pattern_sentiment pipeline component scores the same text
+        THEN polarity and subjectivity are identical."""
+        import pipeline.analyze  # noqa: F401 — registers the component
+        import spacy
+        from textblob import TextBlob
+
+        text = "The markets had a great day, but analysts remain cautious. " * 4
+        nlp = spacy.blank("en")
+        nlp.add_pipe("pattern_sentiment")
+        doc = nlp(text)
+
+        expected = TextBlob(text).sentiment
+        assert doc._.sentiment_polarity == pytest.approx(expected.polarity)
+        assert doc._.sentiment_subjectivity == pytest.approx(expected.subjectivity)
+
+    def test_pattern_sentiment_skips_short_text(self):
+        """GIVEN a snippet shorter than SENTIMENT_MIN_CHARS
+        WHEN the pattern_sentiment component runs
+        THEN polarity and subjectivity are left as None."""
+        import spacy
+        from pipeline.analyze import SENTIMENT_MIN_CHARS
+
+        nlp = spacy.blank("en")
+        nlp.add_pipe("pattern_sentiment")
+        doc = nlp("A great day." * ((SENTIMENT_MIN_CHARS - 1) // 12))
+
+        assert doc._.sentiment_polarity is None
+        assert doc._.sentiment_subjectivity is None
+
+    def test_pattern_sentiment_scores_only_leading_chars(self):
+        """GIVEN a text longer than SENTIMENT_MAX_CHARS
+        WHEN the pattern_sentiment component runs
+        THEN only the leading SENTIMENT_MAX_CHARS are scored."""
+        import spacy
+        from pipeline.analyze import SENTIMENT_MAX_CHARS
+        from textblob import TextBlob
+
+        lead = "The markets had a great day. " * (SENTIMENT_MAX_CHARS // 29 + 1)
+        text = lead[:SENTIMENT_MAX_CHARS] + " Everything was terrible and awful." * 100
+        nlp = spacy.blank("en")
+        nlp.add_pipe("pattern_sentiment")
+        doc = nlp(text)
+
+        expected = TextBlob(text[:SENTIMENT_MAX_CHARS]).sentiment
+        assert doc._.sentiment_polarity == pytest.approx(expected.polarity)
+        assert doc._.sentiment_polarity > 0
@@ -1,7 +1,8 @@
 """
 Unit tests for stratified credential resolution functions.
 
-Tests resolve_newsapi_country() and resolve_newsapi_topic() covering:
+Tests resolve_newsapi_country(), resolve_newsapi_topic() and
+resolve_ner_processes() covering:
 - Default values when nothing is configured
 - Environment variable overrides
 - Airflow Variable overrides
@@ -12,7 +13,11 @@ from unittest.mock import patch
 
 import pytest
 
-from pipeline.credentials import resolve_newsapi_country, resolve_newsapi_topic
+from pipeline.credentials import (
+    resolve_ner_processes,
+    resolve_newsapi_country,
+    resolve_newsapi_topic,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -115,3 +120,50 @@ class TestResolveNewsapiTopic:
                 result = resolve_newsapi_topic()
 
         assert result == "technology"
+
+
+# ---------------------------------------------------------------------------
+# resolve_ner_processes tests
+# ---------------------------------------------------------------------------
+
+
+class TestResolveNerProcesses:
+    """Tests for resolve_ner_processes()."""
+
+    def test_default_leaves_one_core_free(self, monkeypatch):
+        """GIVEN no NER_PROCESSES in env or Airflow Variables
+        WHEN resolve_ner_processes() is called
+        THEN it returns the CPU count minus one."""
+        monkeypatch.delenv("NER_PROCESSES", raising=False)
+        monkeypatch.setattr(os, "cpu_count", lambda: 8)
+
+        with (
+            patch("pipeline.credentials._try_airflow_variable", return_value=None),
+            patch("pipeline.credentials._load_dotenv"),
+        ):
+            assert resolve_ner_processes() == 7
+
+    def test_env_var_overrides_default(self, monkeypatch):
+        """GIVEN NER_PROCESSES=2 in the environment
+        WHEN resolve_ner_processes() is called
+        THEN it returns 2."""
+        monkeypatch.setenv("NER_PROCESSES", "2")
+
+        with (
+            patch("pipeline.credentials._try_airflow_variable", return_value=None),
+            patch("pipeline.credentials._load_dotenv"),
+        ):
+            assert resolve_ner_processes() == 2
+
+    def test_invalid_value_falls_back_to_default(self, monkeypatch):
+        """GIVEN NER_PROCESSES is not an integer
+        WHEN resolve_ner_processes() is called
+        THEN the CPU-based default is used."""
+        monkeypatch.setenv("NER_PROCESSES", "many")
+        monkeypatch.setattr(os, "cpu_count", lambda: 1)
+
+        with (
+            patch("pipeline.credentials._try_airflow_variable", return_value=None),
+            patch("pipeline.credentials._load_dotenv"),
+        ):
+            assert resolve_ner_processes() == 1
@@ -54,7 +54,7 @@ class TestDagIntegrity:
     def test_dag_has_expected_task_ids(self):
         """GIVEN the news ETL DAG
         WHEN parsed
-        THEN it contains all four core task IDs."""
+        THEN it contains all five core task IDs."""
         try:
             from airflow.models import DagBag
         except ImportError:
@@ -69,12 +69,32 @@ class TestDagIntegrity:
         task_ids = {t.task_id for t in dag.tasks}
         expected = {
             "extract_newsapi_task",
+            "build_scrape_batches_task",
             "scrape_content_task",
             "ml_analysis_task",
             "load_postgres_task",
         }
         assert task_ids == expected, f"Task IDs mismatch: {task_ids}"
 
+    def test_scrape_task_is_mapped_in_pool(self):
+        """GIVEN the news ETL DAG
+        WHEN parsed
+        THEN scrape_content_task is dynamically mapped and runs in the scrape pool."""
+        try:
+            from airflow.models import DagBag
+        except ImportError:
+            pytest.skip("Airflow not installed")
+
+        dag_folder = os.path.join(os.path.dirname(__file__), "..", "..", "dags")
+        dagbag = DagBag(dag_folder=dag_folder, include_examples=False)
+
+        dag = dagbag.dags.get("ingestion_newsapi_postgres_with_scraping")
+        assert dag is not None, "Expected DAG not found"
+
+        scrape_task = dag.get_task("scrape_content_task")
+        assert scrape_task.is_mapped, "scrape_content_task is not dynamically mapped"
+        assert scrape_task.partial_kwargs["pool"] == "scrape_pool"
+
     def test_dag_has_deadline_alert(self):
         """GIVEN the news ETL DAG
         WHEN parsed
@@ -12,6 +12,14 @@ from airflow.exceptions import AirflowException
 NEWS_API_ENDPOINT = "https://newsapi.org/v2/top-headlines"
 
 
+@pytest.fixture(autouse=True)
+def newsapi_cache_path(tmp_path):
+    """Point the NewsAPI response cache at a temp file — never the real data volume."""
+    cache_path = tmp_path / "newsapi_cache.json"
+    with patch("pipeline.extract.NEWS_API_CACHE_PATH", str(cache_path)):
+        yield cache_path
+
+
 # ---------------------------------------------------------------------------
 # Tests: successful extraction
 # ---------------------------------------------------------------------------
@@ -92,6 +100,22 @@ class TestExtractErrors:
             with pytest.raises(AirflowException, match="API key is invalid"):
                 extract_data_from_newsapi()
 
+    def test_malformed_json_raises_after_retries(self, requests_mock):
+        """GIVEN NewsAPI returns 200 with a body that is not valid JSON
+        WHEN extract runs THEN it retries and raises AirflowException."""
+        requests_mock.get(NEWS_API_ENDPOINT, text="<html>Bad Gateway</html>", status_code=200)
+
+        with patch("time.sleep", return_value=None), \
+                patch("pipeline.extract.resolve_newsapi_key", return_value="test-api-key"), \
+                patch("pipeline.extract.resolve_newsapi_country", return_value="us"), \
+                patch("pipeline.extract.resolve_newsapi_topic", return_value=None):
+            from pipeline.extract import extract_data_from_newsapi
+
+            with pytest.raises(AirflowException, match="Invalid JSON"):
+                extract_data_from_newsapi()
+
+        assert requests_mock.call_count == 3
+
     def test_missing_api_key_raises(self):
         """GIVEN NEWS_API_KEY is not resolvable
         WHEN extract runs THEN it raises AirflowException."""
@@ -430,3 +454,66 @@ class TestExtractRetry:
                 extract_data_from_newsapi()
 
         assert requests_mock.call_count == 3
+
+
+# ---------------------------------------------------------------------------
+# Tests: conditional requests (ETag / Last-Modified cache)
+# ---------------------------------------------------------------------------
+
+
+class TestExtractConditionalRequest:
+    """A cached response turns unchanged headlines into a 304 round-trip."""
+
+    def _extract(self, country="us"):
+        with patch("pipeline.extract.resolve_newsapi_key", return_value="test-api-key"), \
+                patch("pipeline.extract.resolve_newsapi_country", return_value=country), \
+                patch("pipeline.extract.resolve_newsapi_topic", return_value=None):
+            from pipeline.extract import extract_data_from_newsapi
+
+            return extract_data_from_newsapi()
+
+    def test_304_reuses_cached_articles(self, requests_mock, newsapi_response):
+        """GIVEN a previous 200 response carried an ETag
+        WHEN the next run gets 304 Not Modified
+        THEN If-None-Match was sent and the cached articles are returned."""
+        requests_mock.get(NEWS_API_ENDPOINT, [
+            {"json": newsapi_response, "status_code": 200, "headers": {"ETag": '"v1"'}},
+            {"status_code": 304},
+        ])
+
+        first = self._extract()
+        second = self._extract()
+
+        assert requests_mock.call_count == 2
+        assert "If-None-Match" not in requests_mock.request_history[0].headers
+        assert requests_mock.request_history[1].headers["If-None-Match"] == '"v1"'
+        assert second == first
+        assert len(second) == 3
+
+    def test_cache_not_used_for_different_query(self, requests_mock, newsapi_response):
+        """GIVEN a cached response for country=us
+        WHEN the next run queries country=gb
+        THEN no conditional headers are sent."""
+        requests_mock.get(
+            NEWS_API_ENDPOINT,
+            json=newsapi_response,
+            status_code=200,
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 15 Jan 2024 10:00:00 GMT"},
+        )
+
+        self._extract(country="us")
+        self._extract(country="gb")
+
+        headers = requests_mock.request_history[1].headers
+        assert "If-None-Match" not in headers
+        assert "If-Modified-Since" not in headers
+
+    def test_no_validators_not_cached(self, requests_mock, newsapi_response, newsapi_cache_path):
+        """GIVEN a 200 response with neither ETag nor Last-Modified
+        WHEN extract_data_from_newsapi runs
+        THEN no cache file is written."""
+        requests_mock.get(NEWS_API_ENDPOINT, json=newsapi_response, status_code=200)
+
+        self._extract()
+
+        assert not newsapi_cache_path.exists()
@@ -69,7 +69,7 @@ class TestLoadDataToPostgres:
     def test_insert_success(self, load_ready_articles):
         """GIVEN valid analyzed articles
         WHEN load_data_to_postgres runs
-        THEN executemany is called, commit is called, and returns record count."""
+        THEN execute_values is called, commit is called, and returns record count."""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
         mock_cursor.rowcount = len(load_ready_articles)
@@ -80,29 +80,35 @@ class TestLoadDataToPostgres:
 
         from pipeline.load import load_data_to_postgres
 
-        with patch("pipeline.load.get_db_connection", return_value=mock_conn):
+        with (
+            patch("pipeline.load.get_db_connection", return_value=mock_conn),
+            patch("pipeline.load.execute_values") as mock_execute_values,
+        ):
             result = load_data_to_postgres(**mock_context)
 
         # Verify return value equals number of records loaded
         assert result == len(load_ready_articles)
 
-        # Verify the SQL was executed
-        mock_cursor.executemany.assert_called_once()
+        # Verify the SQL was executed as a single batched call
+        mock_execute_values.assert_called_once()
         mock_conn.commit.assert_called_once()
 
         # Verify the call arguments contain expected field values
-        call_args = mock_cursor.executemany.call_args
-        sql, records = call_args[0]
+        call_args = mock_execute_values.call_args
+        cursor, sql, records = call_args[0]
+        assert cursor is mock_cursor
+        assert "VALUES %s" in sql
+        assert call_args[1]["page_size"] == 1000
         assert len(records) == 2
+        mock_cursor.execute.assert_called_once_with("SET LOCAL synchronous_commit TO OFF")
         assert records[0][0] == "Market Rally Continues"  # title
 
     def test_db_error_triggers_rollback_and_raises(self, load_ready_articles):
-        """GIVEN the database connection but executemany fails
+        """GIVEN the database connection but execute_values fails
         WHEN load_data_to_postgres runs
         THEN conn.rollback() is called and AirflowException is raised."""
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
-        mock_cursor.executemany.side_effect = Exception("Simulated DB error")
         mock_conn.cursor.return_value = mock_cursor
 
         mock_context = {"ti": MagicMock()}
@@ -112,6 +118,10 @@ class TestLoadDataToPostgres:
 
         with (
             patch("pipeline.load.get_db_connection", return_value=mock_conn),
+            patch(
+                "pipeline.load.execute_values",
+                side_effect=Exception("Simulated DB error"),
+            ),
             pytest.raises(AirflowException, match="Database error"),
         ):
             load_data_to_postgres(**mock_context)
@@ -133,11 +143,14 @@ class TestLoadDataToPostgres:
 
         from pipeline.load import load_data_to_postgres
 
-        with patch("pipeline.load.get_db_connection", return_value=mock_conn):
+        with (
+            patch("pipeline.load.get_db_connection", return_value=mock_conn),
+            patch("pipeline.load.execute_values") as mock_execute_values,
+        ):
             load_data_to_postgres(**mock_context)
 
-        call_args = mock_cursor.executemany.call_args
-        _sql, records = call_args[0]
+        call_args = mock_execute_values.call_args
+        _cursor, _sql, records = call_args[0]
         # Second article has named_entities=None → should be Python None
         assert records[1][10] is None
 
@@ -154,14 +167,41 @@ class TestLoadDataToPostgres:
 
         from pipeline.load import load_data_to_postgres
 
-        with patch("pipeline.load.get_db_connection", return_value=mock_conn):
+        with (
+            patch("pipeline.load.get_db_connection", return_value=mock_conn),
+            patch("pipeline.load.execute_values") as mock_execute_values,
+        ):
             load_data_to_postgres(**mock_context)
 
-        call_args = mock_cursor.executemany.call_args
-        _sql, records = call_args[0]
+        call_args = mock_execute_values.call_args
+        _cursor, _sql, records = call_args[0]
         # First article has named_entities → should be JSON string
         import json
 
         entities = json.loads(records[0][10])
         assert isinstance(entities, list)
         assert entities[0]["text"] == "Dow Jones"
+
+    def test_duplicate_urls_collapsed_to_last_record(self, load_ready_articles):
+        """GIVEN two articles sharing the same url
+        WHEN the batched upsert is built
+        THEN only the last record for that url is sent."""
+        mock_conn = MagicMock()
+        mock_conn.cursor.return_value = MagicMock()
+
+        duplicate = dict(load_ready_articles[0], title="Market Rally Continues (updated)")
+        mock_context = {"ti": MagicMock()}
+        mock_context["ti"].xcom_pull.return_value = load_ready_articles + [duplicate]
+
+        from pipeline.load import load_data_to_postgres
+
+        with (
+            patch("pipeline.load.get_db_connection", return_value=mock_conn),
+            patch("pipeline.load.execute_values") as mock_execute_values,
+        ):
+            result = load_data_to_postgres(**mock_context)
+
+        _cursor, _sql, records = mock_execute_values.call_args[0]
+        assert result == 2
+        assert len(records) == 2
+        assert records[0][0] == "Market Rally Continues (updated)"
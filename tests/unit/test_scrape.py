@@ -3,12 +3,24 @@ Unit tests for concurrent web scraping (scrape_and_enrich_content).
 
 All HTTP calls are intercepted by requests-mock — zero real network.
 Tests cover: HTML extraction, robots.txt caching, 404 skipping,
-retry behavior, and empty input handling.
+retry behavior, per-domain rate limiting, and empty input handling.
 """
 
 from unittest.mock import MagicMock, patch
 from urllib.robotparser import RobotFileParser
 
+import pytest
+
+
+@pytest.fixture
+def scrape_session():
+    """A scrape session as built by the task, closed after the test."""
+    from pipeline.scrape import _build_session
+
+    with _build_session("NewsETL/1.0") as session:
+        yield session
+
+
 # ---------------------------------------------------------------------------
 # Worker-level tests (_scrape_single_article)
 # ---------------------------------------------------------------------------
@@ -17,7 +29,7 @@ from urllib.robotparser import RobotFileParser
 class TestScrapeSingleArticle:
     """Direct tests of the _scrape_single_article worker function."""
 
-    def test_extracts_html_content(self, requests_mock, sample_article):
+    def test_extracts_html_content(self, requests_mock, sample_article, scrape_session):
         """GIVEN a URL with HTML <p> elements
         WHEN _scrape_single_article runs
         THEN the content field is updated with scraped paragraph text."""
@@ -32,13 +44,97 @@ class TestScrapeSingleArticle:
         from pipeline.scrape import _scrape_single_article
 
         original = sample_article.copy()
-        result = _scrape_single_article(original, "NewsETL/1.0", {})
+        result = _scrape_single_article(original, "NewsETL/1.0", {}, scrape_session)
 
         assert "First paragraph" in result["content"]
         assert "Second paragraph" in result["content"]
         assert len(result["content"]) > len(sample_article.get("content", ""))
 
-    def test_404_skipped_without_retry(self, requests_mock, sample_article):
+    def test_non_html_response_skipped(self, requests_mock, sample_article, scrape_session):
+        """GIVEN a URL serving a PDF
+        WHEN _scrape_single_article runs
+        THEN the body is not parsed and the original content is kept."""
+        requests_mock.get(
+            "https://example.com/article1",
+            content=b"%PDF-1.7 <p>not html</p>",
+            headers={"Content-Type": "application/pdf"},
+            status_code=200,
+        )
+
+        from pipeline.scrape import _scrape_single_article
+
+        original = sample_article.copy()
+        result = _scrape_single_article(original, "NewsETL/1.0", {}, scrape_session)
+
+        assert result["content"] == sample_article["content"]
+
+    def test_reads_at_most_max_bytes(self, requests_mock, sample_article, scrape_session):
+        """GIVEN a page larger than SCRAPE_MAX_BYTES
+        WHEN _scrape_single_article runs
+        THEN only paragraphs within the first SCRAPE_MAX_BYTES are extracted."""
+        from pipeline.config import SCRAPE_MAX_BYTES
+
+        head = "<html><body><p>Lead paragraph with the article body.</p>"
+        padding = "<div>" + "x" * SCRAPE_MAX_BYTES + "</div>"
+        html = head + padding + "<p>Trailing paragraph.</p></body></html>"
+        requests_mock.get(
+            "https://example.com/article1",
+            text=html,
+            headers={"Content-Type": "text/html; charset=utf-8"},
+            status_code=200,
+        )
+
+        from pipeline.scrape import _scrape_single_article
+
+        result = _scrape_single_article(sample_article.copy(), "NewsETL/1.0", {}, scrape_session)
+
+        assert result["content"].startswith("Lead paragraph with the article body.")
+        assert "Trailing paragraph" not in result["content"]
+
+    def test_header_charset_used_without_meta_tag(
+        self, requests_mock, sample_article, scrape_session
+    ):
+        """GIVEN a UTF-8 page with non-ASCII text, its charset only in the Content-Type header
+        WHEN _scrape_single_article runs
+        THEN the text is decoded as UTF-8, not Latin-1."""
+        text = "It\u2019s caf\u00e9 \u2014 a longer paragraph with curly quotes and dashes."
+        requests_mock.get(
+            "https://example.com/article1",
+            content=f"<html><body><p>{text}</p></body></html>".encode(),
+            headers={"Content-Type": "text/html; charset=utf-8"},
+            status_code=200,
+        )
+
+        from pipeline.scrape import _scrape_single_article
+
+        result = _scrape_single_article(sample_article.copy(), "NewsETL/1.0", {}, scrape_session)
+
+        assert result["content"] == text
+
+    def test_undeclared_utf8_decoded_despite_truncation(
+        self, requests_mock, sample_article, scrape_session
+    ):
+        """GIVEN a UTF-8 page with no charset anywhere, cut mid-character at SCRAPE_MAX_BYTES
+        WHEN _scrape_single_article runs
+        THEN the body is still decoded as UTF-8."""
+        from pipeline.config import SCRAPE_MAX_BYTES
+
+        head = "<html><body><p>It\u2019s caf\u00e9 \u2014 the lead paragraph.</p><div>".encode()
+        padding = b"x" * (SCRAPE_MAX_BYTES - len(head) - 1)
+        requests_mock.get(
+            "https://example.com/article1",
+            content=head + padding + "\u2014 rest".encode(),
+            headers={"Content-Type": "text/html"},
+            status_code=200,
+        )
+
+        from pipeline.scrape import _scrape_single_article
+
+        result = _scrape_single_article(sample_article.copy(), "NewsETL/1.0", {}, scrape_session)
+
+        assert result["content"].startswith("It\u2019s caf\u00e9 \u2014 the lead paragraph.")
+
+    def test_404_skipped_without_retry(self, requests_mock, sample_article, scrape_session):
         """GIVEN a URL returns 404
         WHEN _scrape_single_article runs
         THEN the original content is preserved (no crash, no retry)."""
@@ -47,11 +143,11 @@ class TestScrapeSingleArticle:
         from pipeline.scrape import _scrape_single_article
 
         original = sample_article.copy()
-        result = _scrape_single_article(original, "NewsETL/1.0", {})
+        result = _scrape_single_article(original, "NewsETL/1.0", {}, scrape_session)
 
         assert result["content"] == original["content"]
 
-    def test_robots_disallowed_skips_scraping(self, requests_mock, sample_article):
+    def test_robots_disallowed_skips_scraping(self, requests_mock, sample_article, scrape_session):
         """GIVEN robots.txt disallows the user-agent on this URL
         WHEN _scrape_single_article runs
         THEN the article is returned unchanged (no HTTP request made)."""
@@ -62,14 +158,14 @@ class TestScrapeSingleArticle:
         from pipeline.scrape import _scrape_single_article
 
         original = sample_article.copy()
-        result = _scrape_single_article(original, "NewsETL/1.0", robots_cache)
+        result = _scrape_single_article(original, "NewsETL/1.0", robots_cache, scrape_session)
 
         # Article should be unchanged — no scrape attempted
         assert result["content"] == original["content"]
         # Verify no GET request was made for the article
         assert requests_mock.call_count == 0
 
-    def test_robots_cache_used_per_domain(self, requests_mock):
+    def test_robots_cache_used_per_domain(self, requests_mock, scrape_session):
         """GIVEN articles from the same domain
         WHEN _scrape_single_article is called multiple times
         THEN the cached RobotFileParser is reused (domain keyed)."""
@@ -86,14 +182,151 @@ class TestScrapeSingleArticle:
         article1 = {"title": "A1", "url": "https://example.com/article1", "content": "orig"}
         article3 = {"title": "A3", "url": "https://example.com/article3", "content": "orig"}
 
-        result1 = _scrape_single_article(article1, "NewsETL/1.0", robots_cache)
-        result3 = _scrape_single_article(article3, "NewsETL/1.0", robots_cache)
+        result1 = _scrape_single_article(article1, "NewsETL/1.0", robots_cache, scrape_session)
+        result3 = _scrape_single_article(article3, "NewsETL/1.0", robots_cache, scrape_session)
 
         assert "Content." in result1["content"]
         assert "Content." in result3["content"]
         # Both used the shared cache entry — same rp object
 
 
+# ---------------------------------------------------------------------------
+# Session tests (_build_session)
+# ---------------------------------------------------------------------------
+
+
+class TestBuildSession:
+    """Tests for the shared scrape session and its adapter-level retries."""
+
+    def test_adapter_retries_transient_errors_with_retry_after(self):
+        """GIVEN a scrape session
+        WHEN its HTTPS adapter is inspected
+        THEN 429/5xx are retried with backoff honouring a capped Retry-After, and 404 is not."""
+        from pipeline.scrape import _build_session
+
+        retry = _build_session("NewsETL/1.0", 4).get_adapter("https://example.com").max_retries
+
+        assert retry.total == 3
+        assert retry.backoff_factor > 0
+        assert retry.respect_retry_after_header
+        assert retry.retry_after_max == 30
+        assert {429, 500, 502, 503, 504} <= set(retry.status_forcelist)
+        assert 404 not in retry.status_forcelist
+        assert not retry.raise_on_status
+
+    def test_session_without_retries(self):
+        """GIVEN a session built with retries=False (used for robots.txt)
+        WHEN its HTTPS adapter is inspected
+        THEN no request is retried, whatever the status or Retry-After."""
+        from pipeline.scrape import _build_session
+
+        retry = _build_session("NewsETL/1.0", retries=False).get_adapter("https://x").max_retries
+
+        assert retry.total == 0
+        assert not retry.status_forcelist
+
+    def test_user_agent_set_once_on_session(self):
+        """GIVEN a configured User-Agent
+        WHEN the session is built THEN it is a default header for every request."""
+        from pipeline.scrape import _build_session
+
+        assert _build_session("NewsETL/1.0").headers["User-Agent"] == "NewsETL/1.0"
+
+
+# ---------------------------------------------------------------------------
+# robots.txt fetch tests (_fetch_robots)
+# ---------------------------------------------------------------------------
+
+
+class TestFetchRobots:
+    """Tests for robots.txt fetching through the shared scrape session."""
+
+    def test_parses_rules_with_session_user_agent(self, requests_mock):
+        """GIVEN a robots.txt disallowing a path
+        WHEN _fetch_robots runs
+        THEN the parser applies the rules and the request carries the User-Agent."""
+        requests_mock.get(
+            "https://example.com/robots.txt",
+            text="User-agent: *\nDisallow: /private/\n",
+            status_code=200,
+        )
+
+        from pipeline.scrape import _build_session, _fetch_robots
+
+        rp = _fetch_robots(_build_session("NewsETL/1.0"), "example.com")
+
+        assert rp.can_fetch("NewsETL", "https://example.com/news/1")
+        assert not rp.can_fetch("NewsETL", "https://example.com/private/1")
+        assert requests_mock.last_request.headers["User-Agent"] == "NewsETL/1.0"
+
+    def test_forbidden_disallows_all_and_missing_allows_all(self, requests_mock):
+        """GIVEN robots.txt returns 403 on one domain and 404 on another
+        WHEN _fetch_robots runs
+        THEN it matches RobotFileParser.read: 403 disallows, 404 allows."""
+        requests_mock.get("https://example.com/robots.txt", status_code=403)
+        requests_mock.get("https://example.org/robots.txt", status_code=404)
+
+        from pipeline.scrape import _build_session, _fetch_robots
+
+        session = _build_session("NewsETL/1.0")
+
+        assert not _fetch_robots(session, "example.com").can_fetch(
+            "NewsETL", "https://example.com/a"
+        )
+        assert _fetch_robots(session, "example.org").can_fetch("NewsETL", "https://example.org/a")
+
+    def test_server_error_disallows_all(self, requests_mock):
+        """GIVEN robots.txt returns 503
+        WHEN _fetch_robots runs
+        THEN it matches RobotFileParser.read: the parser stays unread and refuses every URL."""
+        requests_mock.get("https://example.com/robots.txt", status_code=503)
+
+        from pipeline.scrape import _build_session, _fetch_robots
+
+        rp = _fetch_robots(_build_session("NewsETL/1.0"), "example.com")
+
+        assert not rp.can_fetch("NewsETL", "https://example.com/news/1")
+
+
+# ---------------------------------------------------------------------------
+# Rate limiter tests (_DomainRateLimiter)
+# ---------------------------------------------------------------------------
+
+
+class TestDomainRateLimiter:
+    """Tests for the per-domain request spacing used by scrape workers."""
+
+    def test_same_domain_waits_for_interval(self):
+        """GIVEN two back-to-back hits on the same domain
+        WHEN the second hit arrives before the interval has elapsed
+        THEN the limiter sleeps for the remaining time."""
+        from pipeline.scrape import _DomainRateLimiter
+
+        limiter = _DomainRateLimiter(0.2)
+        with (
+            patch("pipeline.scrape.time.monotonic", side_effect=[10.0, 10.05, 10.2]),
+            patch("pipeline.scrape.time.sleep") as mock_sleep,
+        ):
+            limiter.wait("example.com")
+            limiter.wait("example.com")
+
+        mock_sleep.assert_called_once()
+        assert mock_sleep.call_args[0][0] == pytest.approx(0.15)
+
+    def test_different_domains_do_not_wait(self):
+        """GIVEN hits on two different domains
+        WHEN both arrive at the same time
+        THEN neither is delayed."""
+        from pipeline.scrape import _DomainRateLimiter
+
+        limiter = _DomainRateLimiter(0.2)
+        with patch("pipeline.scrape.time.sleep") as mock_sleep:
+            limiter.wait("example.com")
+            limiter.wait("example.org")
+
+        mock_sleep.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # Function-level tests (scrape_and_enrich_content)
 # ---------------------------------------------------------------------------
@@ -103,18 +336,13 @@ class TestScrapeAndEnrichContent:
     """Tests for the full scrape_and_enrich_content task function."""
 
     def test_empty_articles_returns_empty_list(self):
-        """GIVEN no articles from upstream
-        WHEN scrape_and_enrich_content runs THEN it returns [].
-
-        Note: Test case not requiring xcom."""
-        pass  # This test is covered when mock ti returns []
-        # Actually, let's test it:
+        """GIVEN an empty batch
+        WHEN scrape_and_enrich_content runs THEN it returns []."""
         mock_context = {"ti": MagicMock()}
-        mock_context["ti"].xcom_pull.return_value = []
 
         from pipeline.scrape import scrape_and_enrich_content
 
-        result = scrape_and_enrich_content(**mock_context)
+        result = scrape_and_enrich_content([], **mock_context)
         assert result == []
 
     @patch("pipeline.scrape.resolve_user_agent")
@@ -127,12 +355,11 @@ class TestScrapeAndEnrichContent:
         mock_ua.return_value = "TestAgent/1.0"
 
         mock_context = {"ti": MagicMock()}
-        mock_context["ti"].xcom_pull.return_value = sample_articles
 
         from pipeline.scrape import scrape_and_enrich_content
 
         # The function should call the config resolvers *inside* the callable
-        result = scrape_and_enrich_content(**mock_context)
+        result = scrape_and_enrich_content(sample_articles, **mock_context)
 
         mock_workers.assert_called_once()
         mock_ua.assert_called_once()
@@ -146,7 +373,6 @@ class TestScrapeAndEnrichContent:
         WHEN scrape_and_enrich_content runs
         THEN robots.txt is fetched once per domain (cached in local dict)."""
         mock_context = {"ti": MagicMock()}
-        mock_context["ti"].xcom_pull.return_value = sample_articles
 
         # Mock robots.txt responses
         requests_mock.get(
@@ -164,23 +390,106 @@ class TestScrapeAndEnrichContent:
 
         with patch(
             "pipeline.scrape._scrape_single_article",
-            side_effect=lambda a, ua, cache: a,
+            side_effect=lambda a, *args: a,
         ):
-            result = scrape_and_enrich_content(**mock_context)
+            result = scrape_and_enrich_content(sample_articles, **mock_context)
 
         assert isinstance(result, list)
 
+
+# ---------------------------------------------------------------------------
+# Batching tests (build_scrape_batches)
+# ---------------------------------------------------------------------------
+
+
+class TestBuildScrapeBatches:
+    """Tests for splitting extracted articles into mapped scrape batches."""
+
     def test_none_articles_from_xcom(self):
         """GIVEN xcom_pull returns None
-        WHEN scrape_and_enrich_content runs THEN it returns [].
+        WHEN build_scrape_batches runs THEN it returns [].
 
-        This covers the case where the task context returns None instead of [].
         The `if not articles:` guard handles both None and empty list.
         """
         mock_context = {"ti": MagicMock()}
         mock_context["ti"].xcom_pull.return_value = None
 
-        from pipeline.scrape import scrape_and_enrich_content
+        from pipeline.scrape import build_scrape_batches
 
-        result = scrape_and_enrich_content(**mock_context)
-        assert result == []
+        assert build_scrape_batches(**mock_context) == []
+
+    @patch("pipeline.scrape.get_db_connection")
+    def test_same_domain_kept_in_one_batch(self, mock_get_conn, sample_articles):
+        """GIVEN articles from two domains
+        WHEN build_scrape_batches runs
+        THEN each domain's articles land together in a single op_kwargs batch."""
+        mock_context = {"ti": MagicMock()}
+        mock_context["ti"].xcom_pull.return_value = sample_articles
+
+        from pipeline.scrape import build_scrape_batches
+
+        batches = build_scrape_batches(**mock_context)
+
+        assert len(batches) == 2
+        urls = [[a["url"] for a in batch["articles"]] for batch in batches]
+        assert urls[0] == ["https://example.com/article1", "https://example.com/article3"]
+        assert urls[1] == ["https://example.org/article2"]
+
+    @patch("pipeline.scrape.get_db_connection")
+    def test_batch_count_capped(self, mock_get_conn):
+        """GIVEN more domains than SCRAPE_MAX_BATCHES
+        WHEN build_scrape_batches runs
+        THEN no more than SCRAPE_MAX_BATCHES batches are produced and no article is lost."""
+        articles = [{"title": f"A{i}", "url": f"https://site{i}.example/a"} for i in range(40)]
+        mock_context = {"ti": MagicMock()}
+        mock_context["ti"].xcom_pull.return_value = articles
+
+        from pipeline.config import SCRAPE_MAX_BATCHES
+        from pipeline.scrape import build_scrape_batches
+
+        batches = build_scrape_batches(**mock_context)
+
+        assert len(batches) == SCRAPE_MAX_BATCHES
+        assert sum(len(batch["articles"]) for batch in batches) == 40
+
+    def test_already_ingested_articles_dropped(self, sample_articles):
+        """GIVEN one article url already stored with full content
+        WHEN build_scrape_batches runs
+        THEN that article is not batched for scraping."""
+        mock_conn = MagicMock()
+        mock_cursor = MagicMock()
+        mock_cursor.fetchall.return_value = [("https://example.org/article2",)]
+        mock_conn.cursor.return_value = mock_cursor
+
+        mock_context = {"ti": MagicMock()}
+        mock_context["ti"].xcom_pull.return_value = sample_articles
+
+        from pipeline.scrape import build_scrape_batches
+
+        with patch("pipeline.scrape.get_db_connection", return_value=mock_conn):
+            batches = build_scrape_batches(**mock_context)
+
+        urls = [a["url"] for batch in batches for a in batch["articles"]]
+        assert "https://example.org/article2" not in urls
+        assert len(urls) == 2
+        sql, params = mock_cursor.execute.call_args[0]
+        assert "url = ANY(%s)" in sql
+        assert params[0] == [a["url"] for a in sample_articles]
+        mock_conn.close.assert_called_once()
+
+    def test_lookup_failure_keeps_all_articles(self, sample_articles):
+        """GIVEN the database cannot be reached
+        WHEN build_scrape_batches runs
+        THEN every article is still batched for scraping."""
+        mock_context = {"ti": MagicMock()}
+        mock_context["ti"].xcom_pull.return_value = sample_articles
+
+        from pipeline.scrape import build_scrape_batches
+
+        with patch(
+            "pipeline.scrape.get_db_connection",
+            side_effect=RuntimeError("Failed to connect to PostgreSQL"),
+        ):
+            batches = build_scrape_batches(**mock_context)
+
+        assert sum(len(batch["articles"]) for batch in batches) == 3